@@ -0,0 +1,56 @@
+import datetime
+import importlib.machinery
+import importlib.util
+import os
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'MASTER_FINALE.PY')
+
+
+class Clock:
+    """Stands in for datetime.date.today(); day(n) is n days after the first day"""
+
+    def __init__(self, monkeypatch):
+        self.first_day = datetime.date(2025, 3, 1)
+        self.today = self.first_day
+        clock = self
+
+        class FakeDate(datetime.date):
+            @classmethod
+            def today(cls):
+                return clock.today
+
+        monkeypatch.setattr(datetime, 'date', FakeDate)
+
+    def day(self, n):
+        return self.first_day + datetime.timedelta(days=n)
+
+    def set(self, n):
+        self.today = self.day(n)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    return Clock(monkeypatch)
+
+
+@pytest.fixture
+def start_app(tmp_path, monkeypatch):
+    """Return a function that starts a fresh copy of the program on the data in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    started = []
+
+    def start(backend='csv'):
+        loader = importlib.machinery.SourceFileLoader(f'car_rental_{len(started)}', APP_PATH)
+        spec = importlib.util.spec_from_loader(loader.name, loader)
+        app = importlib.util.module_from_spec(spec)
+        loader.exec_module(app)
+        if backend == 'sqlite':
+            app.Storage.use(app.SQLiteHandler)
+        started.append(app)
+        return app
+
+    yield start
+    for app in started:
+        app.SQLiteHandler.close()
@@ -0,0 +1,72 @@
+import itertools
+
+
+def add_fleet(app):
+    models = [('Toyota', 'Corolla', 4, 900), ('Toyota', 'Hiace', 12, 6000), ('toyota', 'Prado', 7, 5000),
+              ('Honda', 'Civic', 4, 1000), ('Honda', 'BR-V', 7, 4999.5), ('Suzuki', 'Alto', 4, 1999)]
+    return [app.Car(brand, model, seats, price) for brand, model, seats, price in models]
+
+
+def scan(cars, brand=None, seats=None, max_price=None, available_only=True):
+    """The list scan FleetIndex.query replaces"""
+    return {car.car_id for car in cars
+            if (car.is_avail or not available_only)
+            and (not brand or car.brand.lower() == brand.lower())
+            and (seats is None or car.seats == seats)
+            and (max_price is None or car.price_per_day <= max_price)}
+
+
+def test_query_matches_a_list_scan_for_every_filter(start_app):
+    app = start_app()
+    app.seed_data()
+    cars = add_fleet(app)
+    cars[2].car_rented()
+
+    for brand, seats, max_price, available_only in itertools.product(
+            [None, 'toyota', 'HONDA', 'Kia'], [None, 4, 7, 5], [None, 999, 1000, 4999.5, 5000, 100000],
+            [True, False]):
+        found = app.FleetIndex.query(brand=brand, seats=seats, max_price=max_price,
+                                     available_only=available_only)
+        assert len(found) == len({car.car_id for car in found})
+        assert {car.car_id for car in found} == scan(cars, brand, seats, max_price, available_only)
+
+
+def test_query_walks_the_smallest_bucket(start_app):
+    app = start_app()
+    app.seed_data()
+    add_fleet(app)
+    walked = []
+
+    class Bucket(dict):
+        def values(self):
+            walked.append(self.name)
+            return super().values()
+
+    for name, index, key in [('brand', app.FleetIndex.by_brand, 'honda'),
+                             ('seats', app.FleetIndex.by_seats, 7)]:
+        index[key] = Bucket(index[key])
+        index[key].name = name
+
+    # Two Hondas, two seven-seaters and six cars under the price cap; ties go to the brand
+    assert len(app.FleetIndex.query(brand='Honda', seats=7)) == 1
+    assert len(app.FleetIndex.query(brand='Honda', max_price=100000)) == 2
+    assert len(app.FleetIndex.query(seats=7, max_price=100000)) == 2
+    assert walked == ['brand', 'brand', 'seats']
+
+
+def test_renting_and_returning_moves_a_car_between_available_and_reserved(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    car = add_fleet(app)[0]
+    client = app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 10000)
+
+    app.RentalService.rent(client, car.car_id, 2)
+    assert car.car_id in app.FleetIndex.reserved and car.car_id not in app.FleetIndex.available
+    assert car not in app.FleetIndex.query(brand='Toyota', seats=4)
+    assert car in app.FleetIndex.query(brand='Toyota', seats=4, available_only=False)
+    assert car in app.FleetIndex.reserved_cars()
+
+    app.RentalService.return_car(client)
+    assert car.car_id in app.FleetIndex.available and car.car_id not in app.FleetIndex.reserved
+    assert car in app.FleetIndex.query(brand='Toyota', seats=4)
+    assert car in app.FleetIndex.available_cars()
@@ -0,0 +1,61 @@
+def register(app, admin, name, balance):
+    return app.RentalService.register_client(admin, name, 'pw', name.title(), 'Test', 'Street 1', balance)
+
+
+def balance_after_restart(start_app, username):
+    app = start_app()
+    app.seed_data()
+    return app, app.UserDirectory.get(username)
+
+
+def test_torn_last_record_is_dropped_and_later_records_survive(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    john = register(app, admin, 'john', 1000)
+    app.RentalService.deposit(john, 500)
+
+    # Crash while writing the next record: no newline, and a truncated balance
+    with open(app.Journal.JOURNAL_FILE, 'a', newline='') as file:
+        file.write(f"balance,{john.username},99")
+
+    app, john = balance_after_restart(start_app, john.username)
+    assert john.check_balance() == 1500
+    app.RentalService.deposit(john, 100)
+
+    app, john = balance_after_restart(start_app, john.username)
+    assert john.check_balance() == 1600
+
+
+def test_record_failing_its_checksum_is_skipped(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    john = register(app, admin, 'john', 1000)
+    app.RentalService.deposit(john, 500)
+
+    with open(app.Journal.JOURNAL_FILE) as file:
+        journal = file.read()
+    with open(app.Journal.JOURNAL_FILE, 'w') as file:
+        file.write(journal.replace(',1500.0,', ',9500.0,'))
+
+    app, john = balance_after_restart(start_app, john.username)
+    assert john.check_balance() == 1000
+
+
+def test_compacting_inside_a_batch_keeps_the_rest_of_the_batch(start_app, monkeypatch):
+    app = start_app()
+    admin = app.seed_data()
+    john = register(app, admin, 'john', 1000)
+
+    # Compact halfway through a batch, as the write-behind thread does in --serve mode
+    monkeypatch.setattr(app.Journal, 'COMPACT_THRESHOLD', app.Journal.pending + 3)
+    app.Journal.begin_batch()
+    for _ in range(6):
+        john.deposit(1)
+        app.Storage.active.update_user(john)
+    app.Journal.end_batch()
+    monkeypatch.setattr(app.Journal, 'COMPACT_THRESHOLD', 1000)
+    for _ in range(3):
+        app.RentalService.deposit(john, 100)
+
+    app, john = balance_after_restart(start_app, john.username)
+    assert john.check_balance() == 1306
@@ -0,0 +1,54 @@
+import os
+
+
+def test_bytes_written_counts_encoded_bytes(start_app):
+    app = start_app()
+    app.Metrics.enable()
+    admin = app.seed_data()
+    size = os.path.getsize(app.Journal.JOURNAL_FILE)
+    registered = app.Metrics.bytes_written['user.register']
+
+    app.RentalService.register_client(admin, 'zoe', 'pw', 'Zoë', 'Ağa', 'Gulshan-e-Iqbāl', 1000)
+
+    written = os.path.getsize(app.Journal.JOURNAL_FILE) - size
+    assert app.Metrics.bytes_written['user.register'] - registered == written
+    assert app.Metrics.bytes_written['journal.append'] == written + size
+
+
+def test_write_behind_charges_writes_to_the_calling_operation(start_app):
+    app = start_app()
+    app.Metrics.enable()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    john = app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 10000)
+
+    app.WriteBehind.start(app.Storage.active)
+    try:
+        app.RentalService.rent(john, car.car_id, 2)
+    finally:
+        app.WriteBehind.stop()
+
+    assert app.Metrics.bytes_written['rental.create'] > 0
+    assert app.Metrics.bytes_written['rental.create'] == app.Metrics.bytes_written['csv.record_rental']
+
+
+def test_batches_and_admin_logins_are_measured(start_app):
+    app = start_app()
+    app.Metrics.enable()
+    admin = app.seed_data()
+    john = app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 1000)
+
+    app.WriteBehind.start(app.Storage.active)
+    try:
+        app.RentalService.deposit(john, 100)
+    finally:
+        app.WriteBehind.stop()
+    for operation in ('csv.begin_batch', 'csv.end_batch', 'journal.end_batch'):
+        assert app.Metrics.timers[operation][0] >= 1
+
+    # The Admin Login menu option checks credentials the same way
+    assert app.RentalService.authenticate('admin', 'admin123', app.Administer) is admin
+    assert app.RentalService.authenticate('admin', 'wrong', app.Administer) is None
+    assert app.RentalService.authenticate(john.username, 'pw', app.Administer) is None
+    assert app.Metrics.timers['user.login'][0] == 3
+    assert app.Metrics.errors['user.login'] == 2
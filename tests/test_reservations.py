@@ -0,0 +1,158 @@
+import pytest
+
+
+def register(app, admin, name):
+    return app.RentalService.register_client(admin, name, 'pw', name.title(), 'Test', 'Street 1', 10000)
+
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+def test_restart_gives_the_car_back_to_the_booking_that_holds_it(start_app, clock, backend):
+    app = start_app(backend)
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    alice = register(app, admin, 'alice')
+    bob = register(app, admin, 'bob')
+
+    # Alice never shows up for her booking, so Bob's later booking gets the car
+    app.RentalService.rent(alice, car.car_id, 2, clock.day(1))
+    bob_booking = app.RentalService.rent(bob, car.car_id, 3, clock.day(5))
+    clock.set(5)
+    assert app.RentalService.start_due_bookings(bob) is bob_booking
+
+    # Restart without a clean shutdown
+    app.SQLiteHandler.close()
+    clock.set(6)
+    app = start_app(backend)
+    app.seed_data()
+
+    alice = app.UserDirectory.get(alice.username)
+    bob = app.UserDirectory.get(bob.username)
+    assert bob.rental is not None and bob.rental.rental_id == bob_booking.rental_id
+    assert alice.rental is None
+    with pytest.raises(ValueError):
+        app.RentalService.return_car(alice)
+    assert not app.FleetIndex.get(car.car_id).is_avail
+
+
+def test_booking_cannot_be_cancelled_once_it_has_started(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    alice = register(app, admin, 'alice')
+    booking = app.RentalService.rent(alice, car.car_id, 2, clock.day(1))
+
+    clock.set(10)
+    with pytest.raises(ValueError):
+        app.RentalService.cancel_booking(alice, booking.rental_id)
+    assert not booking.cancel()
+    assert alice.check_balance() == 8000
+
+
+def test_booking_that_ran_out_expires_instead_of_taking_the_car(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    alice = register(app, admin, 'alice')
+    booking = app.RentalService.rent(alice, car.car_id, 2, clock.day(1))
+
+    clock.set(4)
+    assert app.RentalService.start_due_bookings(alice) is None
+    assert not booking.is_active
+    assert car.is_avail
+    assert app.ReservationIndex.bookings(car) == []
+    assert alice.check_balance() == 8000
+
+
+def test_bookings_that_ran_out_while_stopped_expire_on_startup(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    alice = register(app, admin, 'alice')
+    app.RentalService.rent(alice, car.car_id, 2, clock.day(1))
+
+    clock.set(4)
+    app = start_app()
+    app.seed_data()
+    alice = app.UserDirectory.get(alice.username)
+    assert app.RentalService.upcoming_bookings(alice) == []
+    assert not any(rental.is_active for rental in alice.rental_history)
+    assert app.ReservationIndex.free_cars(clock.day(4), clock.day(6)) != []
+
+
+def rent_then_overrun(app, admin, clock):
+    """Alice rents for days 0-2 and Bob books days 2-4; on day 3 Alice still has the car"""
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    alice = register(app, admin, 'alice')
+    bob = register(app, admin, 'bob')
+    app.RentalService.rent(alice, car.car_id, 2)
+    booking = app.RentalService.rent(bob, car.car_id, 2, clock.day(2))
+    clock.set(3)
+    assert app.RentalService.start_due_bookings(bob) is None
+    return car, alice, bob, booking
+
+
+def test_booking_held_up_by_a_late_return_can_be_cancelled(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car, alice, bob, booking = rent_then_overrun(app, admin, clock)
+
+    assert app.RentalService.upcoming_bookings(bob) == [booking]
+    app.RentalService.cancel_booking(bob, booking.rental_id)
+    assert bob.check_balance() == 10000
+
+
+def test_booking_that_ran_out_while_the_car_was_out_is_refunded(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car, alice, bob, booking = rent_then_overrun(app, admin, clock)
+
+    clock.set(5)
+    assert app.RentalService.start_due_bookings(bob) is None
+    assert not booking.is_active
+    assert bob.check_balance() == 10000
+
+
+def test_late_return_refunds_the_bookings_it_blocked(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car, alice, bob, booking = rent_then_overrun(app, admin, clock)
+
+    # Bob only logs in after Alice finally brings the car back
+    clock.set(5)
+    app.RentalService.return_car(alice)
+    assert not booking.is_active
+    assert bob.check_balance() == 10000
+
+    clock.set(6)
+    app = start_app()
+    app.seed_data()
+    bob = app.UserDirectory.get(bob.username)
+    assert bob.check_balance() == 10000
+    assert app.RentalService.upcoming_bookings(bob) == []
+
+
+def test_booking_is_kept_when_the_car_came_back_in_time_to_collect(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car, alice, bob, booking = rent_then_overrun(app, admin, clock)
+
+    app.RentalService.return_car(alice)
+    assert booking.is_active
+    clock.set(5)
+    assert app.RentalService.start_due_bookings(bob) is None
+    assert not booking.is_active
+    assert bob.check_balance() == 8000
+
+
+def test_overdue_car_is_not_free_for_later_dates(start_app, clock):
+    app = start_app()
+    admin = app.seed_data()
+    car, alice, bob, booking = rent_then_overrun(app, admin, clock)
+    carol = register(app, admin, 'carol')
+
+    assert car not in app.RentalService.free_cars(clock.day(10), 2)
+    with pytest.raises(ValueError):
+        app.RentalService.rent(carol, car.car_id, 2, clock.day(10))
+
+    app.RentalService.return_car(alice)
+    assert car in app.RentalService.free_cars(clock.day(10), 2)
@@ -0,0 +1,103 @@
+import json
+import socket
+import threading
+
+import pytest
+
+SESSIONS = 40
+
+
+@pytest.fixture
+def server(start_app):
+    """Serve a fresh copy of the program as serve() does, and yield (app, admin, address)"""
+    app = start_app()
+    admin = app.seed_data()
+    app.WriteBehind.start(app.Storage.active)
+    server = app.RentalServer(('127.0.0.1', 0), app.RentalRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield app, admin, server.server_address
+    server.shutdown()
+    server.server_close()
+    if app.Storage.active is app.WriteBehind:
+        app.WriteBehind.stop()
+
+
+class Session:
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.file = self.sock.makefile('rwb')
+
+    def send(self, line):
+        self.file.write(line.encode() + b'\n')
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def request(self, **request):
+        return self.send(json.dumps(request))
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def register(app, admin, name, balance=5000):
+    return app.RentalService.register_client(admin, name, 'pw', name.title(), 'Test', 'Street 1', balance)
+
+
+def test_racing_sessions_rent_a_car_exactly_once(server, start_app):
+    app, admin, address = server
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    clients = [register(app, admin, f'client{i}') for i in range(SESSIONS)]
+    sessions = [Session(address) for _ in clients]
+    for session, client in zip(sessions, clients):
+        assert session.request(op='login', username=client.username, password='pw')['ok']
+
+    start = threading.Barrier(SESSIONS)
+    replies = {}
+
+    def rent(session, client):
+        start.wait()
+        replies[client.username] = session.request(op='rent', car_id=car.car_id, days=2)
+
+    threads = [threading.Thread(target=rent, args=pair) for pair in zip(sessions, clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for session in sessions:
+        session.close()
+
+    winners = [username for username, reply in replies.items() if reply['ok']]
+    assert len(replies) == SESSIONS and len(winners) == 1
+
+    # Flush the write-behind queue, then restart from what reached the disk
+    app.WriteBehind.stop()
+    app = start_app()
+    app.seed_data()
+    assert not app.FleetIndex.get(car.car_id).is_avail
+    for client in clients:
+        client = app.UserDirectory.get(client.username)
+        if client.username in winners:
+            assert client.check_balance() == 3000
+            assert client.rental is not None and client.rental.car.car_id == car.car_id
+        else:
+            assert client.check_balance() == 5000
+            assert client.rental is None and client.rental_history == []
+
+
+def test_bad_requests_are_rejected_and_the_session_survives(server):
+    app, admin, address = server
+    app.Car('Toyota', 'Hiace', 7, 1000)
+    client = register(app, admin, 'john')
+    session = Session(address)
+
+    assert session.send('[]') == {'ok': False, 'error': 'Each request must be a JSON object.'}
+    assert session.request(op='login', username=client.username, password='pw')['ok']
+    for amount in ('nan', 'inf', '-5', 0):
+        assert not session.request(op='deposit', amount=amount)['ok']
+    assert session.request(op='balance')['balance'] == 5000
+    assert not session.send('{"op": "rent", "car_id": "X", "days": 1e400}')['ok']
+    assert [car['model'] for car in session.request(op='list', seats='7')['cars']] == ['Hiace']
+    assert not session.request(op='list', seats='seven')['ok']
+    session.close()
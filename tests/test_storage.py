@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+def test_default_admin_is_saved_and_reused(start_app, backend):
+    app = start_app(backend)
+    admin = app.seed_data()
+    app.Storage.active.save_all()
+
+    app = start_app(backend)
+    assert app.Storage.active.load_admins()[0].username == admin.username
+    assert app.seed_data().security_check('admin123')
+    assert len(app.Storage.active.load_admins()) == 1
+
+
+def test_sqlite_operations_are_timed_and_their_writes_counted(start_app):
+    app = start_app('sqlite')
+    app.Metrics.enable()
+    admin = app.seed_data()
+    app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 1000)
+
+    text = app.Metrics.render()
+    assert 'car_rental_operation_seconds_count{operation="sqlite.save_user"} 2' in text
+    assert 'car_rental_operation_seconds_count{operation="sqlite.load_cars"} 1' in text
+    assert app.Metrics.bytes_written['sqlite.save_user'] > 0
+    assert app.Metrics.bytes_written['user.register'] > 0
+
+
+def test_restart_keeps_car_ids_and_usernames_and_leaves_the_files_alone(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    cars = {app.Car('Toyota', 'Corolla', 4, 1000).car_id for _ in range(3)}
+    users = {app.RentalService.register_client(admin, name, 'pw', 'John', 'Test', 'Street 1', 1000).username
+             for name in ('john', 'jane')}
+    app.Storage.active.save_all()
+    files = {}
+    for path in (app.CSVHandler.CARS_FILE, app.CSVHandler.USERS_FILE):
+        with open(path, 'rb') as file:
+            files[path] = (file.read(), os.stat(path).st_mtime_ns)
+
+    for _ in range(2):
+        app = start_app()
+        app.seed_data()
+        assert set(app.FleetIndex.by_id) == cars
+        assert set(app.UserDirectory.clients) == users
+        assert app.UserDirectory.get(admin.username).security_check('admin123')
+
+    for path, (data, mtime) in files.items():
+        with open(path, 'rb') as file:
+            assert file.read() == data
+        assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_empty_or_incomplete_files_do_not_stop_startup(start_app, capsys):
+    app = start_app()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    app.Storage.active.save_all()
+    open(app.CSVHandler.USERS_FILE, 'w').close()
+    with open(app.CSVHandler.RENTALS_FILE, 'w') as file:
+        file.write('rental_id,client_id,car_id\n')
+
+    app = start_app()
+    assert app.seed_data().username == admin.username
+    assert list(app.FleetIndex.by_id) == [car.car_id]
+    assert app.UserDirectory.clients == {}
+    assert 'Error loading rentals.csv: missing column(s) days' in capsys.readouterr().out
+
+
+def test_user_that_failed_to_save_is_not_registered(start_app, monkeypatch):
+    app = start_app()
+    admin = app.seed_data()
+
+    def fail(user):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app.CSVHandler, 'save_user', fail)
+    with pytest.raises(ValueError):
+        app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 1000)
+    assert app.UserDirectory.clients == {}
+    assert not app.UserDirectory.base_taken('john')
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_rental_history_survives_a_restart_with_or_without_compaction(start_app, compact):
+    app = start_app()
+    admin = app.seed_data()
+    car = app.Car('Toyota', 'Corolla', 4, 1000)
+    client = app.RentalService.register_client(admin, 'john', 'pw', 'John', 'Test', 'Street 1', 5000)
+    rental = app.RentalService.rent(client, car.car_id, 2)
+    app.RentalService.return_car(client)
+    if compact:
+        app.Storage.active.save_all()
+
+    app = start_app()
+    app.seed_data()
+    history = app.UserDirectory.get(client.username).rental_history
+    assert [(past.rental_id, past.is_active) for past in history] == [(rental.rental_id, False)]
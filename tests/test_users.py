@@ -0,0 +1,45 @@
+import pytest
+
+
+def register(app, admin, base_name):
+    return app.RentalService.register_client(admin, base_name, 'pw', 'John', 'Test', 'Street 1', 1000)
+
+
+def test_base_name_is_matched_exactly(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    register(app, admin, 'john_smith')
+
+    assert app.UserDirectory.base_taken('john_smith')
+    # A plain prefix match used to reserve 'john' as well
+    assert not app.UserDirectory.base_taken('john')
+    assert not app.UserDirectory.base_taken('john_smit')
+    # 'admin' carries no generated tag, so it reserves no base name
+    assert not app.UserDirectory.base_taken('admin')
+
+    john = register(app, admin, 'john')
+    assert app.UserDirectory.base_name(john.username) == 'john'
+    with pytest.raises(ValueError):
+        register(app, admin, 'john')
+
+
+def test_base_names_are_indexed_again_after_a_restart(start_app):
+    app = start_app()
+    admin = app.seed_data()
+    register(app, admin, 'john')
+
+    app = start_app()
+    app.seed_data()
+    assert app.UserDirectory.base_taken('john')
+    assert not app.UserDirectory.base_taken('jo')
+
+
+def test_generated_tag_retries_until_the_username_is_free(start_app, monkeypatch):
+    app = start_app()
+    admin = app.seed_data()
+    suffixes = iter(['AB12', 'AB12', 'CD34'])
+    monkeypatch.setattr(app.random, 'choices', lambda population, k: next(suffixes))
+
+    first = register(app, admin, 'john')
+    assert first.username == 'john_AB12'
+    assert app.User.generate_username_tag('john') == 'john_CD34'